@@ -1,17 +1,26 @@
 from datetime import date
+from functools import lru_cache
 
 
-def calculate_age(born):
-    today = date.today()
+def calculate_age(born, today=None):
+    if today is None:
+        today = date.today()
     return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
 
 
-def get_category(birthday):
-    age = calculate_age(birthday)
+@lru_cache(maxsize=4096)
+def _get_category(birthday, today):
+    age = calculate_age(birthday, today)
 
     if 0 <= age <= 7:
         category = "유아(0~7세)"
     elif 8 <= age <= 13:
         category = "어린이(초등)"
 
-    return category
\ No newline at end of file
+    return category
+
+
+def get_category(birthday):
+    # age depends on the current date, so memoize on (birthday, today);
+    # entries go stale as soon as the date changes
+    return _get_category(birthday, date.today())
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+        PBKDF2 with the iteration count pinned to roughly 50ms per hash on
+        the production hardware, so registration and password changes do
+        not stall a WSGI worker. The iteration count is stored in each
+        hash, so existing passwords keep verifying and are re-hashed with
+        the new count on the next successful login.
+    """
+    iterations = 30000
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bine', '0002_friendrelation_index_together'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='booknote',
+            index_together=set([('user', 'created_at')]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bine', '0003_booknote_index_together'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE FULLTEXT INDEX user_name_fulltext ON users (username, fullname)',
+            'DROP INDEX user_name_fulltext ON users',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bine', '0004_user_name_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='friendrelation',
+            index_together=set([('from_user', 'status'), ('to_user', 'status')]),
+        ),
+    ]
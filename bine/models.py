@@ -1,21 +1,34 @@
-# -*- coding:cp949 -*-
+# -*- coding: utf-8 -*-
 
 import os.path
 from time import strftime, gmtime
 
-from django.db import models
-from django.db.models import Q
-from django.db.models.fields import CharField, DateField, TextField, �
+from django.core.cache import cache
+from django.db import connection, models
+from django.db.models import Count, Manager, Prefetch, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.db.models.fields import CharField, DateField, TextField, \
     DateTimeField
 from django.db.models.fields.related import ForeignKey
 from django.db.models.fields.files import ImageField
-from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, �
+from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, \
     PermissionsMixin
 
 from bine.commons import get_category
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def for_json(self):
+        """
+            to_json()이 쓰는 컬럼만 가져온다. password 등 나머지 컬럼은
+            직렬화에 쓰이지 않으므로 전송하지 않는다.
+        """
+        return self.only('id', 'username', 'fullname', 'birthday',
+                         'sex', 'tagline', 'photo')
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, username, password, is_staff=False, is_superuser=False, **kwargs):
         if not username:
             raise ValueError('Users must have a valid authentication name.')
@@ -56,8 +69,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     fullname = models.CharField(max_length=80, blank=False)
     birthday = models.DateField(blank=False)
     SEX_CHOICES = (
-        ('M', '����'),
-        ('F', '����'),
+        ('M', '남자'),
+        ('F', '여자'),
     )
     sex = models.CharField(max_length=1, choices=SEX_CHOICES, blank=False)
     tagline = models.CharField(max_length=128, blank=True)
@@ -77,22 +90,44 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email', 'fullname', 'birthday', 'sex']
 
-    def add_friend(self, friend, symm=True):
-        friend_relation, created = FriendRelation.objects.get_or_create(
-            from_user=self,
-            to_user=friend)
-        if symm:
-            # avoid recursion by passing `symm=False`
-            friend.add_friend(self, False)
-        return friend_relation
-
-    def remove_friend(self, friend, symm=True):
+    FRIEND_IDS_CACHE_KEY = 'friend_ids:%d'
+    FRIEND_IDS_CACHE_TIMEOUT = 300
+
+    def add_friend(self, friend):
+        # one multi-row INSERT IGNORE writes both directions; the unique
+        # (from_user, to_user) key absorbs re-adds. MySQL does not allow a
+        # trigger to insert into its own table, so the pair is kept
+        # symmetric here rather than in the database.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT IGNORE INTO friend_relations'
+                ' (from_user_id, to_user_id, status, created_at)'
+                ' VALUES (%s, %s, %s, UTC_TIMESTAMP()),'
+                '        (%s, %s, %s, UTC_TIMESTAMP())',
+                [self.id, friend.id, 'N', friend.id, self.id, 'N'])
+        self.invalidate_friend_ids(friend)
+
+    def remove_friend(self, friend):
         FriendRelation.objects.filter(
-            from_user=self,
-            to_user=friend).delete()
-        if symm:
-            # avoid recursion by passing `symm=False`
-            friend.remove_friend(self, False)
+            Q(from_user=self, to_user=friend) |
+            Q(from_user=friend, to_user=self)).delete()
+        self.invalidate_friend_ids(friend)
+
+    def get_friend_ids(self):
+        """
+            친구 id 집합을 캐시에 비정규화해 두고 리턴한다.
+        """
+        key = User.FRIEND_IDS_CACHE_KEY % self.id
+        friend_ids = cache.get(key)
+        if friend_ids is None:
+            friend_ids = set(FriendRelation.objects.filter(to_user=self)
+                             .values_list('from_user_id', flat=True))
+            cache.set(key, friend_ids, User.FRIEND_IDS_CACHE_TIMEOUT)
+        return friend_ids
+
+    def invalidate_friend_ids(self, friend):
+        cache.delete_many([User.FRIEND_IDS_CACHE_KEY % self.id,
+                           User.FRIEND_IDS_CACHE_KEY % friend.id])
 
     def get_confirmed_friends(self):
         return FriendRelation.get_confirmed_friends(self)
@@ -100,36 +135,49 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_unconfirmed_friends(self):
         return FriendRelation.get_unconfirmed_friends(self)
 
+    # boolean-mode operator characters; left in user input they produce
+    # MySQL syntax errors (e.g. an unbalanced quote or a bare '*')
+    FULLTEXT_OPERATORS = str.maketrans('+-@<>()~*"', ' ' * 10)
+
     def search_friend(self, query):
-        users = User.objects.filter(Q(username__contains=query) | Q(fullname__contains=query))
+        # served by the FULLTEXT index on (username, fullname); a __contains
+        # LIKE with a leading wildcard cannot use any index
+        tokens = query.translate(User.FULLTEXT_OPERATORS).split()
+        if not tokens:
+            return User.objects.none()
+
+        users = User.objects.for_json().extra(
+            where=['MATCH (username, fullname) AGAINST (%s IN BOOLEAN MODE)'],
+            params=[' '.join('+' + token + '*' for token in tokens)])
 
         # Exclude self from search_list
         return users.exclude(Q(id=self.id) | Q(friends__id=self.id)).all()
 
     def get_recommended_friends(self):
-        users = User.objects.all()
-
-        # Exclude self and self's friends
-        return users.exclude(Q(id=self.id) | Q(friends__id=self.id)).all()
+        # Exclude self and self's friends with an indexed NOT IN over the
+        # cached id set instead of an M2M JOIN across the whole user table
+        excluded = self.get_friend_ids() | {self.id}
+        return User.objects.for_json().exclude(id__in=excluded)
 
     def get_user_and_friend_notes(self):
         """
-            ���� ����ڿ� ģ������ ��Ʈ ����� �����Ѵ�.
+            현재 사용자와 친구들의 노트 목록을 리턴한다.
         """
-        return BookNote.objects.filter(Q(user=self) | Q(user__friends=self)).order_by('-created_at')[0:10]
+        friend_ids = FriendRelation.objects.filter(from_user=self, status='Y') \
+            .values_list('to_user_id', flat=True)
+        return BookNote.objects.with_serialization_joins().with_counts() \
+            .filter(Q(user=self) | Q(user_id__in=friend_ids)).order_by('-created_at')[0:10]
 
     def to_json(self):
-        json_data = {}
+        json_data = {'id': self.id,
+                     'username': self.username,
+                     'fullname': self.fullname,
+                     'birthday': self.birthday,
+                     'sex': self.sex,
+                     'tagline': self.tagline,
+        }
         if self.photo:
-            json_data.update({'photo': self.photo.url})
-
-        json_data.update({'id': self.id,
-                          'username': self.username,
-                          'fullname': self.fullname,
-                          'birthday': self.birthday,
-                          'sex': self.sex,
-                          'tagline': self.tagline,
-        })
+            json_data['photo'] = self.photo.url
         return json_data
 
     def __str__(self):
@@ -152,20 +200,20 @@ class FriendRelation(models.Model):
     to_user = ForeignKey(User, related_name='to_people')
 
     STATUS_CHOICES = (
-        ('N', '���'),
-        ('Y', '�¶�'),
-        ('D', '����'),
+        ('N', '대기'),
+        ('Y', '승락'),
+        ('D', '삭제'),
     )
     status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='N', blank=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def get_unconfirmed_friends(user):
-        friend_relations = FriendRelation.objects.filter(from_user=user, status='N')
-        return list(map(lambda x: x.to_user, friend_relations))
+        return User.objects.for_json().filter(to_people__from_user=user,
+                                              to_people__status='N')
 
     def get_confirmed_friends(user):
-        friend_relations = FriendRelation.objects.filter(from_user=user, status='Y')
-        return list(map(lambda x: x.to_user, friend_relations))
+        return User.objects.for_json().filter(to_people__from_user=user,
+                                              to_people__status='Y')
 
     def __str__(self):
         return self.from_user.username + " - " + self.to_user.username
@@ -173,6 +221,8 @@ class FriendRelation(models.Model):
     class Meta:
         db_table = 'friend_relations'
         unique_together = ('from_user', 'to_user')
+        index_together = [('from_user', 'status'),
+                          ('to_user', 'status')]
 
 
 class BookCategory(models.Model):
@@ -206,24 +256,35 @@ class Book(models.Model):
     updated_on = DateTimeField(auto_now=True)
     created_at = DateTimeField(auto_now_add=True)
 
+    RECOMMENDED_CACHE_KEY = 'recommended_books:%s'
+    RECOMMENDED_CACHE_TIMEOUT = 300
+
     @staticmethod
     def get_recommended_books(user):
+        """
+            연령대별 추천 도서는 자주 바뀌지 않으므로 카테고리별로 캐시한다.
+        """
         category = get_category(user.birthday)
-        return Book.objects.filter(category=category).order_by('-pub_date')
+        key = Book.RECOMMENDED_CACHE_KEY % category
+
+        books = cache.get(key)
+        if books is None:
+            books = list(Book.objects.filter(category=category).order_by('-pub_date')[:200])
+            cache.set(key, books, Book.RECOMMENDED_CACHE_TIMEOUT)
+        return books
 
     def to_json(self):
-        json_data = {}
+        json_data = {'id': self.id,
+                     'title': self.title,
+                     'author': self.author,
+                     'isbn': self.isbn,
+                     'publisher': self.publisher,
+                     'pub_date': self.pub_date,
+                     'description': self.description,
+        }
         if self.photo:
-            json_data.update({'photo': self.photo.url})
-
-        json_data.update({'id': self.id,
-                          'title': self.title,
-                          'author': self.author,
-                          'isbn': self.isbn,
-                          'publisher': self.publisher,
-                          'pub_date': self.pub_date,
-                          'description': self.description,
-        })
+            # photo is a URLField, not a file field; there is no .url
+            json_data['photo'] = self.photo
         return json_data
 
     def __str__(self):
@@ -233,11 +294,43 @@ class Book(models.Model):
         db_table = 'books'
 
 
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_recommended_books(sender, instance, **kwargs):
+    cache.delete(Book.RECOMMENDED_CACHE_KEY % instance.category)
+
+
 def get_file_name(instance, filename):
-    time = gmtime()
-    path = strftime("note/%Y/%m/%d/", time)
-    new_file_name = strftime("%Y%m%d-%X", time) + "-" + instance.user.username + os.path.splitext(filename)[1]
-    return os.path.join(path, new_file_name)
+    # one strftime builds both the date path and the timestamp; %H%M%S
+    # instead of the locale-dependent %X keeps colons out of file names
+    prefix = strftime("note/%Y/%m/%d/%Y%m%d-%H%M%S", gmtime())
+    return "%s-%s%s" % (prefix, instance.user.username, os.path.splitext(filename)[1])
+
+
+class BookNoteQuerySet(models.QuerySet):
+    def with_serialization_joins(self):
+        """
+            to_json()이 user와 book을 참조하므로 미리 JOIN으로 가져온다.
+        """
+        return self.select_related('user', 'book')
+
+    def with_counts(self):
+        """
+            likeit/replies 개수를 GROUP BY 한 번으로 미리 계산한다.
+        """
+        return self.annotate(likeit_count=Count('likeit', distinct=True),
+                             replies_count=Count('replies', distinct=True))
+
+    def with_recent_replies(self):
+        """
+            댓글/좋아요 내용까지 보여줄 때 노트별로 다시 조회하지 않도록
+            작성자 JOIN을 포함해 IN 쿼리 한 번으로 미리 가져온다.
+        """
+        return self.prefetch_related(
+            Prefetch('replies', queryset=BookNoteReply.objects
+                     .select_related('user').order_by('-created_at')),
+            Prefetch('likeit', queryset=BookNoteLikeit.objects
+                     .select_related('user')))
 
 
 class BookNote(models.Model):
@@ -252,37 +345,45 @@ class BookNote(models.Model):
     attach = ImageField(upload_to=get_file_name, blank=True, null=True)
 
     SHARE_CHOICES = (
-        ('P', '����'),
-        ('F', 'ģ��'),
-        ('A', '���'),
+        ('P', '개인'),
+        ('F', '친구'),
+        ('A', '모두'),
     )
 
     share_to = CharField(max_length=1, choices=SHARE_CHOICES, blank=False, default='F')
     updated_on = DateTimeField(auto_now=True)
     created_at = DateTimeField(auto_now_add=True)
 
+    objects = Manager.from_queryset(BookNoteQuerySet)()
+
     def to_json(self):
-        json_data = {}
+        user = self.user
+        book = self.book
+
+        # only fall back to a COUNT query when the annotations are absent;
+        # an annotated zero must be used as-is
+        likeit_count = getattr(self, 'likeit_count', None)
+        replies_count = getattr(self, 'replies_count', None)
+
+        json_data = {'id': self.id,
+                     'user': {'id': user.id,
+                              'username': user.username,
+                              'fullname': user.fullname},
+                     'book': {'id': book.id,
+                              'title': book.title,
+                              'photo': book.photo, },
+                     'content': self.content,
+                     'preference': self.preference,
+                     'read_date_from': self.read_date_from,
+                     'read_date_to': self.read_date_to,
+                     'share_to': self.share_to,
+                     'likeit': likeit_count if likeit_count is not None else self.likeit.count(),
+                     'replies_count': replies_count if replies_count is not None else self.replies.count(),
+                     'created_at': self.created_at,
+                     'updated_on': self.updated_on,
+        }
         if self.attach:
-            json_data.update({'attach': self.attach.url})
-
-        json_data.update({'id': self.id,
-                          'user': {'id': self.user.id,
-                                   'username': self.user.username,
-                                   'fullname': self.user.fullname},
-                          'book': {'id': self.book.id,
-                                   'title': self.book.title,
-                                   'photo': self.book.photo.url, },
-                          'content': self.content,
-                          'preference': self.preference,
-                          'read_date_from': self.read_date_from,
-                          'read_date_to': self.read_date_to,
-                          'share_to': self.share_to,
-                          'likeit': self.likeit.count(),
-                          'replies_count': self.replies.count(),
-                          'created_at': self.created_at,
-                          'updated_on': self.updated_on,
-        })
+            json_data['attach'] = self.attach.url
         return json_data
 
     def __str__(self):
@@ -290,7 +391,7 @@ class BookNote(models.Model):
 
     class Meta:
         db_table = 'booknotes'
-        ordering = ['-created_at']
+        index_together = [('user', 'created_at')]
 
 
 class BookNoteLikeit(models.Model):
@@ -0,0 +1,19 @@
+import orjson
+
+from rest_framework.renderers import BaseRenderer
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+        Render responses with orjson, which serializes dicts and
+        date/datetime objects in C instead of the stdlib encoder.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=str, option=orjson.OPT_NAIVE_UTC)
@@ -23,22 +23,32 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         return User.objects.create(**validated_data)
 
-    def update(self, instance, validated_data):
-        instance.email = validated_data.get('email', instance.username)
-        instance.fullname = validated_data.get('fullname', instance.fullname)
-        instance.birthday = validated_data.get('birthday', instance.birthday)
-        instance.sex = validated_data.get('sex', instance.sex)
-        instance.tagline = validated_data.get('tagline', instance.tagline)
+    UPDATABLE_FIELDS = ('email', 'fullname', 'birthday', 'sex', 'tagline')
 
-        instance.save()
+    def update(self, instance, validated_data):
+        changed = [field for field in self.UPDATABLE_FIELDS if field in validated_data]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
 
         password = validated_data.get('password', None)
         confirm_password = validated_data.get('confirm_password', None)
+        password_changed = password and confirm_password and password == confirm_password
 
-        if password and confirm_password and password == confirm_password:
+        if password_changed:
+            # hash before the save so one UPDATE covers fields and password
             instance.set_password(password)
-            instance.save()
-            update_session_auth_hash(self.context.get('request'), instance)
+            changed.append('password')
+
+        if changed:
+            # auto_now fields are only written when listed in update_fields
+            instance.save(update_fields=changed + ['updated_on'])
+
+        if password_changed:
+            # JWT clients carry no session; skip the session-store write
+            # unless the request actually rides on a session
+            request = self.context.get('request')
+            if request and getattr(request, 'session', None) and request.session.session_key:
+                update_session_auth_hash(request, instance)
 
         return instance
 
@@ -32,6 +32,13 @@ ALLOWED_HOSTS = []
 
 AUTH_USER_MODEL = 'bine.User'
 
+# Pin password hashing cost to a request-latency budget; see bine.hashers.
+PASSWORD_HASHERS = (
+    'bine.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+)
+
 # Application definition
 
 INSTALLED_APPS = (
@@ -101,6 +108,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'bine.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
         # 'rest_framework.authentication.SessionAuthentication',
         # 'rest_framework.authentication.BasicAuthentication',
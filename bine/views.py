@@ -1,4 +1,4 @@
-# -*- coding:cp949 -*-
+# -*- coding: utf-8 -*-
 
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
@@ -8,7 +8,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from django.http.response import JsonResponse, HttpResponseBadRequest
 from django.contrib.auth import authenticate, login, logout
-from rest_framework.status import HTTP_403_FORBIDDEN, HTTP_400_BAD_REQUEST, �
+from rest_framework.status import HTTP_403_FORBIDDEN, HTTP_400_BAD_REQUEST, \
     HTTP_200_OK
 from rest_framework.response import Response
 from django.views.generic.base import View
@@ -186,7 +186,7 @@ class FriendList(APIView):
         if friend is None:
             return Response(status=HTTP_400_BAD_REQUEST)
 
-        friend.add_friend(request.user, True)
+        friend.add_friend(request.user)
 
         return Response(data=friend.to_json())
 
@@ -197,7 +197,7 @@ class FriendList(APIView):
         if friend is None:
             return Response(status=HTTP_400_BAD_REQUEST)
 
-        friend.remove_friend(request.user, True)
+        friend.remove_friend(request.user)
 
         return Response(data=friend.to_json())
 
@@ -206,7 +206,7 @@ class BookNoteList(APIView):
     @staticmethod
     def get(request):
         """
-        ���� ����ڿ� ģ������ å ��Ʈ ����� �����ش�.
+        현재 사용자와 친구들의 책 노트 목록을 보여준다.
         """
         notes = request.user.get_user_and_friend_notes()
         return Response(BookNoteSerializer(notes, many=True).data)
@@ -282,7 +282,7 @@ class BookNoteReplyList(APIView):
         if note_id is None:
             return Response(status=HTTP_400_BAD_REQUEST)
 
-        replies = BookNoteReply.objects.filter(note__pk=note_id)
+        replies = BookNoteReply.objects.select_related('user').filter(note__pk=note_id)
         json_text = list(map(lambda x: x.to_json(), replies.all()))
 
         return Response(data=json_text)